@@ -1,10 +1,16 @@
 import asyncio
 from getpass import getpass
+
+from dotenv import load_dotenv
+
+# Load environment variables before the project modules read them
+load_dotenv()
+
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from db.models import Account
 from routers.srv.auth import hash_password
-from db.database import get_application_session
+from db.database import engine, get_application_session
 
 
 async def reset_password():
@@ -13,16 +19,17 @@ async def reset_password():
 
     async for session in get_application_session():
         query = select(Account).where(Account.username == username)
-        result = await session.execute(query)
-        user = result.one_or_none()
+        user = await session.scalar(query)
 
         if user:
-            user.password = hash_password(new_password)
+            user.password = await hash_password(new_password)
             await session.commit()
             print(f"Password for user '{username}' has been updated.")
         else:
             print(f"User '{username}' not found.")
 
+    await engine.dispose()
+
 
 if __name__ == "__main__":
     asyncio.run(reset_password())
@@ -1,24 +1,79 @@
+import base64
+import hashlib
+import hmac
+import logging
 import os
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+import time
+from functools import cached_property
+from types import MappingProxyType
+from typing import List, Mapping, Optional
 
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
 from fastapi import FastAPI, Request, Response, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import APIKeyCookie
-from jose import JWTError, jwt
-from pydantic import BaseModel, EmailStr
+import jwt
+import orjson
+from dotenv import load_dotenv
+from pydantic import BaseModel, ConfigDict, EmailStr
+
+from src.cache import ExpiringCache
+from src.cookies import read_cookie
+
+logger = logging.getLogger(__name__)
 
 # --- Configuration and Constants ---
-SECRET_KEY = os.getenv("SECRET_KEY", "a_very_secret_dev_key_change_me")
-ALGORITHM = "HS256"
+load_dotenv()  # Entrypoint: load .env once, before any setting is read
+SECRET_KEY = os.getenv("SECRET_KEY")
+if not SECRET_KEY:
+    # Never fall back to a well-known key; tokens would be forgeable
+    raise ValueError("SECRET_KEY environment variable is not set.")
+# HS256 signs with SECRET_KEY; EdDSA uses the Ed25519 key in JWT_PRIVATE_KEY
+ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 REFRESH_INTERVAL_HOURS = 1  # How often refresh is allowed
 MAX_TOKEN_LIFETIME_DAYS = 7
+ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_HOURS * 60 * 60
+REFRESH_INTERVAL_SECONDS = REFRESH_INTERVAL_HOURS * 60 * 60
+MAX_TOKEN_LIFETIME_SECONDS = MAX_TOKEN_LIFETIME_DAYS * 24 * 60 * 60
 COOKIE_NAME = "access_token"
 # --- Set secure flag based on environment ---
 # Set SECURE_COOKIE=False for local HTTP development if needed
 # In production (HTTPS), this should be True
 SECURE_COOKIE = os.getenv("SECURE_COOKIE", "True").lower() == "true"
+# Max number of verified tokens kept in memory
+VERIFY_CACHE_MAX_ENTRIES = 4096
+
+
+def load_signing_keys():
+    """Returns (signing_key, verifying_key) for the configured algorithm."""
+    if ALGORITHM == "HS256":
+        return SECRET_KEY, SECRET_KEY
+    if ALGORITHM != "EdDSA":
+        raise ValueError(f"Unsupported JWT_ALGORITHM: {ALGORITHM}")
+
+    pem = os.getenv("JWT_PRIVATE_KEY")
+    if not pem:
+        raise ValueError("JWT_PRIVATE_KEY is required when using EdDSA.")
+    private_key = load_pem_private_key(pem.encode(), password=None)
+    if not isinstance(private_key, Ed25519PrivateKey):
+        raise ValueError("JWT_PRIVATE_KEY must be an Ed25519 private key.")
+    return private_key, private_key.public_key()
+
+
+SIGNING_KEY, VERIFYING_KEY = load_signing_keys()
+
+# Role IDs map to bits of the "rm" claim: bit (role_id - 1) is set per role
+ADMIN_ROLE_ID = 1
+ADMIN_ROLE_MASK = 1 << (ADMIN_ROLE_ID - 1)
+
+
+def roles_to_mask(roles: List[int]) -> int:
+    """Packs role IDs into the bitmask stored in the "rm" claim."""
+    mask = 0
+    for role_id in roles:
+        mask |= 1 << (role_id - 1)
+    return mask
 
 
 # --- Data Models ---
@@ -30,153 +85,252 @@ class UserPayload(BaseModel):
     email: EmailStr
     roles: List[int]  # 1: admin, 2: user
 
+    model_config = ConfigDict(frozen=True)
+
+    @property
+    def roles_mask(self) -> int:
+        return roles_to_mask(self.roles)
+
+    @cached_property
+    def claims(self) -> dict:
+        """User fields embedded in the JWT, dumped once per (immutable) user."""
+        return {**self.model_dump(), "rm": self.roles_mask}
+
 
 class LoginRequest(BaseModel):
     username: str
 
 
+class MessageResponse(BaseModel):
+    message: str
+
+
+class RefreshResponse(MessageResponse):
+    refresh_success: bool
+    next_refresh_allowed_at: Optional[float] = None
+
+
 # --- Hard-Coded User Store ---
-users_db: Dict[str, UserPayload] = {
-    "admin_user": UserPayload(
-        userId=101,
-        username="admin_user",
-        fullname="Admin Von Admin",
-        title="System Administrator",
-        email="admin@example.com",
-        roles=[1, 2],
-    ),
-    "regular_user": UserPayload(
-        userId=202,
-        username="regular_user",
-        fullname="Reginald User",
-        title="Standard User",
-        email="user@example.com",
-        roles=[2],
-    ),
-}
+users_db: Mapping[str, UserPayload] = MappingProxyType(
+    {
+        "admin_user": UserPayload(
+            userId=101,
+            username="admin_user",
+            fullname="Admin Von Admin",
+            title="System Administrator",
+            email="admin@example.com",
+            roles=[1, 2],
+        ),
+        "regular_user": UserPayload(
+            userId=202,
+            username="regular_user",
+            fullname="Reginald User",
+            title="Standard User",
+            email="user@example.com",
+            roles=[2],
+        ),
+    }
+)
 
 
 # --- JWT Utility Functions ---
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# HS256 tokens share a constant header and key, so both are prepared once
+_HS256_HEADER_B64 = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+_HS256_KEY = SECRET_KEY.encode()
+
+
+def _encode_hs256(payload: dict) -> str:
+    """Signs an HS256 JWT directly, equivalent to jwt.encode(..., "HS256")."""
+    signing_input = _HS256_HEADER_B64 + b"." + _b64url(orjson.dumps(payload))
+    signature = hmac.new(_HS256_KEY, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64url(signature)).decode("ascii")
+
+
 def create_jwt_token(
     user: UserPayload, existing_max_exp: Optional[float] = None
-) -> str:
-    """Generates JWT. Optionally reuses existing max_exp for refresh."""
-    now = datetime.now(timezone.utc)
-    access_expire = now + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+) -> tuple[str, int]:
+    """Generates JWT and returns it with its cookie max-age. Optionally reuses existing max_exp for refresh."""
+    now_ts = int(time.time())
+    access_expire_ts = now_ts + ACCESS_TOKEN_EXPIRE_SECONDS
 
     # Use provided max_exp if refreshing, otherwise calculate new one
     max_expire_ts = existing_max_exp
     if max_expire_ts is None:
-        max_expire = now + timedelta(days=MAX_TOKEN_LIFETIME_DAYS)
+        max_expire_ts = now_ts + MAX_TOKEN_LIFETIME_SECONDS
         # Ensure max_expire isn't accidentally shorter than access_expire
-        effective_max_expire = max(access_expire, max_expire)
-        max_expire_ts = effective_max_expire.timestamp()
+        max_expire_ts = max(access_expire_ts, max_expire_ts)
 
     to_encode = {
         "sub": user.username,
-        "iat": now,
-        "exp": access_expire,
+        "iat": now_ts,
+        "exp": access_expire_ts,
         "max_exp": max_expire_ts,  # Use consistent or new max_exp
-        **user.model_dump(),
+        **user.claims,
     }
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    if ALGORITHM == "HS256":
+        encoded_jwt = _encode_hs256(to_encode)
+    else:
+        encoded_jwt = jwt.encode(to_encode, SIGNING_KEY, algorithm=ALGORITHM)
+    return encoded_jwt, ACCESS_TOKEN_EXPIRE_SECONDS
+
+
+# Raised on every rejected request, so built once instead of per call.
+# Shared instances are raised via with_traceback(None) so their traceback
+# does not keep growing across requests.
+CREDENTIALS_EXCEPTION = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+TOKEN_EXPIRED_EXCEPTION = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Token has expired",
+)
+MAX_LIFETIME_EXCEPTION = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Maximum token lifetime exceeded. Please log in again.",
+)
+NOT_AUTHENTICATED_EXCEPTION = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Not authenticated",
+)
+ADMIN_REQUIRED_EXCEPTION = HTTPException(
+    status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required"
+)
 
 
-def verify_jwt_token(token: str) -> UserPayload:
-    """Validates JWT: signature, standard expiry (exp), and max lifetime (max_exp)."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    token_expired_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Token has expired",
-    )
-    max_lifetime_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Maximum token lifetime exceeded. Please log in again.",
-    )
+def _verify_from_payload(payload: dict) -> None:
+    """Runs the claim checks (sub, max_exp) on an already signature-verified payload."""
+    username: str = payload.get("sub")
+    max_exp_ts: float = payload.get("max_exp")
+
+    if username is None or max_exp_ts is None:
+        logger.debug("Verification Error: Missing sub or max_exp claim.")
+        raise CREDENTIALS_EXCEPTION.with_traceback(None)
 
+    # Verify max lifetime hasn't passed (redundant if exp is shorter, but good practice)
+    if time.time() > max_exp_ts:
+        logger.debug(
+            "Verification Error: Token max lifetime exceeded for user %s",
+            username,
+        )
+        raise MAX_LIFETIME_EXCEPTION.with_traceback(None)
+
+
+def _decode_and_validate(token: str) -> dict:
+    """Validates JWT: signature, standard expiry (exp), and max lifetime (max_exp)."""
     try:
         payload = jwt.decode(
-            token, SECRET_KEY, algorithms=[ALGORITHM]
+            token, VERIFYING_KEY, algorithms=[ALGORITHM]
         )  # Checks signature and 'exp'
-        username: str = payload.get("sub")
-        max_exp_ts: float = payload.get("max_exp")
+        _verify_from_payload(payload)
+
+    except jwt.ExpiredSignatureError:
+        logger.debug("Verification Info: Token signature/exp has expired.")
+        # Raise specific exception for expired 'exp'
+        raise TOKEN_EXPIRED_EXCEPTION.with_traceback(None)
+    except jwt.InvalidTokenError as e:
+        logger.debug("Verification Error: InvalidTokenError - %s", e)
+        raise CREDENTIALS_EXCEPTION.with_traceback(None)
+    except HTTPException:
+        # Claim checks in _verify_from_payload already chose their error
+        raise
+    except Exception as e:
+        logger.warning(
+            "Verification Error: Unexpected - %s - %s", type(e).__name__, e
+        )
+        raise CREDENTIALS_EXCEPTION.with_traceback(None)
 
-        if username is None or max_exp_ts is None:
-            print("Verification Error: Missing sub or max_exp claim.")
-            raise credentials_exception
+    return payload
 
-        # Verify max lifetime hasn't passed (redundant if exp is shorter, but good practice)
-        if datetime.now(timezone.utc).timestamp() > max_exp_ts:
-            print(
-                f"Verification Error: Token max lifetime exceeded for user {username}"
-            )
-            raise max_lifetime_exception
 
-        user_payload = UserPayload(**payload)
+# --- Verification Cache ---
+# token digest -> claims until min(exp, max_exp); claims are read-only
+_verify_cache = ExpiringCache(VERIFY_CACHE_MAX_ENTRIES, clock=time.time)
 
-    except jwt.ExpiredSignatureError:
-        print("Verification Info: Token signature/exp has expired.")
-        raise token_expired_exception  # Raise specific exception for expired 'exp'
-    except JWTError as e:
-        print(f"Verification Error: JWTError - {e}")
-        raise credentials_exception
-    except Exception as e:
-        print(f"Verification Error: Unexpected - {type(e).__name__} - {e}")
-        raise credentials_exception
 
-    return user_payload
+def decode_jwt_token(token: str) -> dict:
+    """Returns verified claims, skipping signature checks for recently verified tokens."""
+    key = _verify_cache.digest(token)
+    cached = _verify_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Missing or expired: the full check raises the right error for the latter
+    payload = _decode_and_validate(token)
+    if "rm" not in payload:
+        # Tokens issued before the roles bitmask claim existed
+        payload["rm"] = roles_to_mask(payload.get("roles", []))
+    max_exp_ts = payload["max_exp"]
+    valid_until = min(payload.get("exp", max_exp_ts), max_exp_ts)
+    _verify_cache.set(key, payload, valid_until)
+    return payload
+
+
+# Cookie attributes are fixed, so the Set-Cookie suffix is rendered once
+COOKIE_ATTRIBUTES = "; HttpOnly; Path=/; SameSite=lax" + (
+    "; Secure" if SECURE_COOKIE else ""
+)
 
 
-def attach_token_to_response(response: Response, token: str):
+def attach_token_to_response(response: Response, token: str, max_age: int):
     """Attaches the JWT token as a secure, HttpOnly cookie."""
-    try:
-        payload = jwt.decode(
-            token,
-            SECRET_KEY,
-            algorithms=[ALGORITHM],
-            options={"verify_exp": False},
-        )
-        exp_timestamp = payload.get("exp")
-        max_age = ACCESS_TOKEN_EXPIRE_HOURS * 60 * 60  # Default fallback
-        if exp_timestamp:
-            now = datetime.now(timezone.utc)
-            expire_dt = datetime.fromtimestamp(exp_timestamp, timezone.utc)
-            max_age_seconds = int((expire_dt - now).total_seconds())
-            max_age = max(0, max_age_seconds)  # Ensure non-negative
-
-        response.set_cookie(
-            key=COOKIE_NAME,
-            value=token,
-            httponly=True,
-            secure=SECURE_COOKIE,  # Use configured value
-            samesite="lax",
-            max_age=max_age,
-            path="/",
-        )
-        print(
-            f"Cookie '{COOKIE_NAME}' attached. Max-Age: {max_age}s, Secure: {SECURE_COOKIE}"
-        )
-    except JWTError as e:
-        print(
-            f"Error attaching cookie: Failed to decode token to get exp - {e}"
-        )
-        # Optionally still try to set cookie with default max_age or handle error
+    cookie = f"{COOKIE_NAME}={token}; Max-Age={max_age}{COOKIE_ATTRIBUTES}"
+    response.raw_headers.append((b"set-cookie", cookie.encode("latin-1")))
+    logger.debug(
+        "Cookie '%s' attached. Max-Age: %ss, Secure: %s",
+        COOKIE_NAME,
+        max_age,
+        SECURE_COOKIE,
+    )
 
 
-# --- Cookie Scheme and Dependencies ---
-cookie_scheme = APIKeyCookie(name=COOKIE_NAME, auto_error=False)
+# --- Authentication Middleware ---
+class JWTAuthMiddleware:
+    """
+    Pure ASGI middleware that verifies the token cookie once per request.
+
+    The decoded claims are stored in scope["state"]["user"] (None when the
+    cookie is missing or invalid); the verification error, if any, is kept
+    in scope["state"]["auth_error"] so dependencies can re-raise it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        state["user"] = None
+        state["auth_error"] = None
+
+        token = read_cookie(scope["headers"], COOKIE_NAME)
+        if token:
+            try:
+                state["user"] = decode_jwt_token(token)
+            except HTTPException as e:
+                state["auth_error"] = e
+
+        await self.app(scope, receive, send)
+
+
+# --- Dependencies ---
 
 
 async def get_token_data_for_refresh(request: Request) -> tuple[str, dict]:
     """Dependency specifically for refresh: gets token, decodes basic claims without full verification."""
     token = request.cookies.get(COOKIE_NAME)
-    print(
-        f"Refresh: Attempting to get cookie '{COOKIE_NAME}'. Found: {'Yes' if token else 'No'}"
+    logger.debug(
+        "Refresh: Attempting to get cookie '%s'. Found: %s",
+        COOKIE_NAME,
+        "Yes" if token else "No",
     )
     if not token:
         raise HTTPException(
@@ -188,7 +342,7 @@ async def get_token_data_for_refresh(request: Request) -> tuple[str, dict]:
         # Decode only signature initially to get claims needed for refresh checks
         payload = jwt.decode(
             token,
-            SECRET_KEY,
+            VERIFYING_KEY,
             algorithms=[ALGORITHM],
             options={"verify_exp": False},
         )
@@ -197,7 +351,7 @@ async def get_token_data_for_refresh(request: Request) -> tuple[str, dict]:
             or not payload.get("iat")
             or not payload.get("max_exp")
         ):
-            print(
+            logger.debug(
                 "Refresh Error: Initial decode missing sub, iat, or max_exp."
             )
             raise HTTPException(
@@ -205,32 +359,30 @@ async def get_token_data_for_refresh(request: Request) -> tuple[str, dict]:
                 detail="Invalid token structure for refresh",
             )
         return token, payload
-    except JWTError as e:
-        print(f"Refresh Error: Initial JWT decode failed - {e}")
+    except jwt.InvalidTokenError as e:
+        logger.debug("Refresh Error: Initial JWT decode failed - %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token format",
         )
 
 
-async def get_current_user(token: str = Depends(cookie_scheme)) -> UserPayload:
-    """Dependency for protected routes: extracts cookie and fully verifies token."""
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-        )
-    return verify_jwt_token(token)  # Use standard verification
+async def get_current_user(request: Request) -> dict:
+    """Dependency for protected routes: returns claims verified by JWTAuthMiddleware."""
+    state = request.scope["state"]
+    user = state.get("user")
+    if user is None:
+        error = state.get("auth_error") or NOT_AUTHENTICATED_EXCEPTION
+        raise error.with_traceback(None)
+    return user
 
 
 async def get_current_admin_user(
-    current_user: UserPayload = Depends(get_current_user),
-) -> UserPayload:
+    current_user: dict = Depends(get_current_user),
+) -> dict:
     """Dependency ensuring user has admin role."""
-    if 1 not in current_user.roles:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required"
-        )
+    if not current_user["rm"] & ADMIN_ROLE_MASK:
+        raise ADMIN_REQUIRED_EXCEPTION.with_traceback(None)
     return current_user
 
 
@@ -250,10 +402,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(JWTAuthMiddleware)
 
 
 # --- API Endpoints ---
-@app.post("/login")
+@app.post("/login", response_model=MessageResponse)
 async def login(login_data: LoginRequest, response: Response):
     user = users_db.get(login_data.username)
     if not user:
@@ -261,41 +414,52 @@ async def login(login_data: LoginRequest, response: Response):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username",
         )
-    token = create_jwt_token(user)
-    attach_token_to_response(response, token)
-    print(f"Login successful for: {user.username}")
+    token, max_age = create_jwt_token(user)
+    attach_token_to_response(response, token, max_age)
+    logger.debug("Login successful for: %s", user.username)
     return {"message": "Login successful"}
 
-@app.post("/refresh")
+@app.post(
+    "/refresh",
+    response_model=RefreshResponse,
+    response_model_exclude_none=True,
+)
 async def refresh_token(
     response: Response,
     token_data: tuple[str, dict] = Depends(get_token_data_for_refresh),
 ):
     """Refreshes token if conditions met (within max lifetime, and after the refresh interval)."""
-    token, payload = token_data
+    _, payload = token_data
     username: str = payload["sub"]
     max_exp_ts: float = payload["max_exp"]
     issued_at_ts: float = payload["iat"]
 
-    print(
-        f"Refresh: Processing for user '{username}'. MaxExpTS: {max_exp_ts}, IatTS: {issued_at_ts}"
+    logger.debug(
+        "Refresh: Processing for user '%s'. MaxExpTS: %s, IatTS: %s",
+        username,
+        max_exp_ts,
+        issued_at_ts,
     )
 
-    now_ts = datetime.now(timezone.utc).timestamp()
+    now_ts = time.time()
 
     # 1. Check maximum lifetime
     if now_ts > max_exp_ts:
-        print(f"Refresh Denied: Max lifetime exceeded for {username}.")
+        logger.debug("Refresh Denied: Max lifetime exceeded for %s.", username)
         raise HTTPException(
             status_code=401,
             detail="Maximum session lifetime exceeded. Please log in again.",
         )
 
     # 2. Check refresh interval (next allowed refresh time)
-    refresh_allowed_at_ts = issued_at_ts + timedelta(hours=REFRESH_INTERVAL_HOURS).total_seconds()
+    refresh_allowed_at_ts = issued_at_ts + REFRESH_INTERVAL_SECONDS
     if now_ts < refresh_allowed_at_ts:
-        print(
-            f"Refresh Info: Interval not met for {username}. Now: {now_ts}, Allowed after: {refresh_allowed_at_ts}"
+        logger.debug(
+            "Refresh Info: Interval not met for %s. Now: %s, "
+            "Allowed after: %s",
+            username,
+            now_ts,
+            refresh_allowed_at_ts,
         )
         return {
             "message": "Refresh interval not met, try again later.",
@@ -303,51 +467,41 @@ async def refresh_token(
             "next_refresh_allowed_at": refresh_allowed_at_ts,
         }
 
-    # 3. Full verification of the original token to ensure it was not tampered with
-    try:
-        verify_jwt_token(token)
-        print(
-            f"Refresh Info: Original token for {username} is still valid, but refresh interval met. Issuing new token."
-        )
-    except HTTPException as e:
-        if e.status_code == 401 and "expired" in e.detail.lower():
-            print(
-                f"Refresh Info: Original token for {username} has expired (expected). Proceeding."
-            )
-        else:
-            print(
-                f"Refresh Denied: Unexpected validation error on original token: {e.detail} ({e.status_code})"
-            )
-            raise e
+    # 3. Claim checks on the original token; its signature was already verified
+    # by get_token_data_for_refresh, and an expired 'exp' is expected here
+    _verify_from_payload(payload)
 
     # 4. Issue new token
     user = users_db.get(username)
     if not user:
-        print(f"Refresh Error: User '{username}' disappeared from DB.")
+        logger.error("Refresh Error: User '%s' disappeared from DB.", username)
         raise HTTPException(status_code=500, detail="Internal inconsistency")
 
-    new_token = create_jwt_token(user, existing_max_exp=max_exp_ts)
-    attach_token_to_response(response, new_token)
-    print(f"Refresh Successful: New token issued for {username}")
+    new_token, max_age = create_jwt_token(user, existing_max_exp=max_exp_ts)
+    attach_token_to_response(response, new_token, max_age)
+    logger.debug("Refresh Successful: New token issued for %s", username)
     return {"message": "Token refreshed successfully", "refresh_success": True}
 
 @app.get("/protected/page1", response_model=UserPayload)
 async def read_protected_page1(
-    current_user: UserPayload = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user),
 ):
     return current_user
 
 
 @app.get("/protected/page2", response_model=UserPayload)
 async def read_protected_page2(
-    admin_user: UserPayload = Depends(get_current_admin_user),
+    admin_user: dict = Depends(get_current_admin_user),
 ):
     return admin_user
 
 
-@app.post("/logout")
-async def logout(response: Response):
-    print("Logout: Clearing cookie.")
+@app.post("/logout", response_model=MessageResponse)
+async def logout(request: Request, response: Response):
+    logger.debug("Logout: Clearing cookie.")
+    token = request.cookies.get(COOKIE_NAME)
+    if token:
+        _verify_cache.pop(_verify_cache.digest(token))
     response.delete_cookie(
         key=COOKIE_NAME,
         secure=SECURE_COOKIE,  # Match settings
@@ -358,6 +512,6 @@ async def logout(response: Response):
     return {"message": "Logout successful"}
 
 
-@app.get("/")
+@app.get("/", response_model=MessageResponse)
 async def root():
     return {"message": "Welcome to the Secure Auth API"}
@@ -1,12 +1,7 @@
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 import logging
 
-# Load environment variables
-load_dotenv()
-
 # Logger setup
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -21,13 +16,18 @@ DB_NAME = os.getenv("DB_NAME")
 
 DATABASE_URL = f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_SERVER}/{DB_NAME}?charset=utf8mb4"
 
-# Create the async engine
-engine = create_async_engine(DATABASE_URL, echo=False)
+# Create the async engine (one pooled engine shared by all sessions)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    pool_size=20,
+    max_overflow=10,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+)
 
 # Create session factory
-async_session_factory = sessionmaker(
-    bind=engine, class_=AsyncSession, expire_on_commit=False
-)
+async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
 
 
 async def get_application_session():
@@ -35,16 +35,5 @@ async def get_application_session():
     Dependency function to provide an application-level async database session.
     Ensures proper cleanup after use.
     """
-
-    engine = create_async_engine(DATABASE_URL, echo=False)
-
-    # Set up the session
-    AsyncSessionLocal = sessionmaker(
-        bind=engine, class_=AsyncSession, expire_on_commit=False
-    )
-
-    try:
-        async with AsyncSessionLocal() as session:
-            yield session
-    finally:
-        await engine.dispose()
+    async with async_session_factory() as session:
+        yield session
@@ -1,10 +1,11 @@
 from typing import List, Optional
 from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
+from sqlalchemy import UniqueConstraint
 from sqlmodel import Field, Relationship, SQLModel
 
 # Default timezone
-cairo_tz = pytz.timezone("Africa/Cairo")
+cairo_tz = ZoneInfo("Africa/Cairo")
 
 
 class Role(SQLModel, table=True):
@@ -40,9 +41,15 @@ class Account(SQLModel, table=True):
 
 class RolePermission(SQLModel, table=True):
     __tablename__ = "role_permission"
+    # Also serves account_id lookups as the leftmost column of the key
+    __table_args__ = (
+        UniqueConstraint(
+            "account_id", "role_id", name="uq_role_permission_account_role"
+        ),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    role_id: int = Field(foreign_key="role.id", nullable=False)
+    role_id: int = Field(foreign_key="role.id", nullable=False, index=True)
     account_id: int = Field(foreign_key="account.id", nullable=False)
 
     # Relationships
@@ -5,7 +5,7 @@ from services.http_schema import LoginRequest, LoginResponse
 from routers.srv.auth import (
     validate_user_name_and_password,
     create_or_update_user,
-    read_roles,
+    read_roles_cached,
 )
 from services.active_directory import authenticate_and_get_user
 from src.exceptions import InvalidCredentialsException, InternalServerException
@@ -81,7 +81,7 @@ async def authenticate_ad_and_update(
 
 async def get_user_roles(session: SessionDep, user) -> list:
     """
-    Retrieve user roles based on admin status.
+    Retrieve user roles based on admin status, served from a short-lived cache.
 
     Args:
         session (SessionDep): Database session dependency.
@@ -91,9 +91,9 @@ async def get_user_roles(session: SessionDep, user) -> list:
         list: A list of roles associated with the user.
     """
     if user.is_super_admin:
-        roles = await read_roles(session)
+        roles = await read_roles_cached(session)
     else:
-        roles = await read_roles(session, user.id)
+        roles = await read_roles_cached(session, user.id)
     return roles
 
 
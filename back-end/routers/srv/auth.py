@@ -1,27 +1,87 @@
+import asyncio
+import base64
+import hashlib
+import hmac
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from sqlmodel import select
 from db.models import Account, Role, RolePermission
+from src.cache import ExpiringCache
 import bcrypt
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-
-def hash_password(password: str) -> str:
+# Seconds a role lookup is served from memory before re-querying
+ROLES_CACHE_TTL_SECONDS = 30.0
+ROLES_CACHE_MAX_ENTRIES = 4096
+# account_id (None = all roles) -> role names; least recently used evicted
+_roles_cache = ExpiringCache(ROLES_CACHE_MAX_ENTRIES)
+
+# Work factor for new hashes (2^rounds iterations); existing hashes keep the
+# cost embedded in them, so lowering this does not affect stored passwords
+BCRYPT_ROUNDS = 10
+
+# New hashes bcrypt an HMAC-SHA256 of the password rather than the password
+# itself: bcrypt rejects input over 72 bytes, while the base64 digest is always
+# 44 bytes with no NULs. The HMAC is keyed with the hash's own bcrypt salt, so
+# the intermediate digest cannot be matched against leaked unsalted SHA-256
+# hashes ("password shucking"). The versioned prefix tells them apart from
+# legacy bare-bcrypt hashes, which still verify and are upgraded on the next
+# successful login.
+BCRYPT_SHA256_PREFIX = "$bcrypt-sha256-v1$"
+# "$2b$", the two-digit cost, "$" and 22 salt characters
+_BCRYPT_SALT_LENGTH = 29
+
+# bcrypt releases the GIL, so one thread per core hashes in parallel without
+# the event loop or the default executor being starved by login bursts
+_BCRYPT_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count(), thread_name_prefix="bcrypt"
+)
+
+# Seconds a successful bcrypt check is remembered for repeat logins
+PASSWORD_CACHE_TTL_SECONDS = 60.0
+PASSWORD_CACHE_MAX_ENTRIES = 4096
+# digest(password, stored hash) -> True; only successes are kept.
+# The stored hash is part of the key, so changing a password (new hash and
+# salt) makes the old entry unreachable without explicit invalidation.
+_verified_passwords = ExpiringCache(PASSWORD_CACHE_MAX_ENTRIES)
+
+# When enabled, logins for unknown usernames spend the same bcrypt time as a
+# wrong password, so response timing does not reveal which accounts exist
+LOGIN_TIMING_SHIELD = (
+    os.getenv("LOGIN_TIMING_SHIELD", "False").lower() == "true"
+)
+# Hashed at the real cost so the dummy check takes as long as a real one
+_DUMMY_HASH = (
+    bcrypt.hashpw(b"timing-shield", bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+    if LOGIN_TIMING_SHIELD
+    else None
+)
+
+
+async def hash_password(password: str) -> str:
     """
-    Hashes a password using bcrypt.
+    Hashes an HMAC-SHA256 prehash of a password with bcrypt on the bcrypt pool.
 
     Args:
         password (str): The plain text password.
 
     Returns:
-        str: The hashed password.
+        str: The prefixed hashed password.
     """
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
-    return hashed.decode("utf-8")
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    secret = _prehash(password.encode("utf-8"), salt)
+    hashed = await asyncio.get_running_loop().run_in_executor(
+        _BCRYPT_POOL, bcrypt.hashpw, secret, salt
+    )
+    return BCRYPT_SHA256_PREFIX + hashed.decode("utf-8")
 
 
 async def validate_user_name_and_password(
@@ -38,22 +98,40 @@ async def validate_user_name_and_password(
     Returns:
         Optional[Account]: The found account instance if authenticated, otherwise None.
     """
-    statement = select(Account).where(Account.username == username)
-    result = await session.execute(statement)
-    account = result.scalar_one_or_none()
+    # Only the hash is needed to decide; load the full account after that
+    statement = (
+        select(Account.id, Account.password)
+        .where(Account.username == username)
+        .limit(1)
+    )
+    row = (await session.execute(statement)).first()
 
-    if account:
-        # Use the stored hashed password directly.
-        if bcrypt.checkpw(
-            password.encode("utf-8"), account.password.encode("utf-8")
-        ):
+    if row:
+        # Use the stored hashed password directly; domain users have none
+        if row.password and await _check_password(password, row.password):
             logger.info(f"User '{username}' authenticated successfully.")
+            account = await session.get(Account, row.id)
+            if not account.password.startswith(BCRYPT_SHA256_PREFIX):
+                # Upgrade the legacy bare-bcrypt hash now that we know the
+                # plaintext; later logins take the prehashed path
+                account.password = await hash_password(password)
+                await session.commit()
+                logger.info(f"Upgraded password hash for user '{username}'.")
             return account
         else:
             logger.warning(
                 f"Authentication failed for user '{username}': invalid password."
             )
     else:
+        if LOGIN_TIMING_SHIELD:
+            await asyncio.get_running_loop().run_in_executor(
+                _BCRYPT_POOL,
+                bcrypt.checkpw,
+                _prehash(
+                    password.encode("utf-8"), _DUMMY_HASH[:_BCRYPT_SALT_LENGTH]
+                ),
+                _DUMMY_HASH,
+            )
         logger.warning(
             f"Authentication failed: no account found for user '{username}'."
         )
@@ -61,6 +139,56 @@ async def validate_user_name_and_password(
     return None
 
 
+def _prehash(pw_bytes: bytes, salt: bytes) -> bytes:
+    """
+    Reduce a password to a fixed-length bcrypt input.
+
+    Args:
+        pw_bytes (bytes): The UTF-8 encoded password.
+        salt (bytes): The bcrypt salt string the result is hashed with.
+
+    Returns:
+        bytes: The base64-encoded HMAC-SHA256 digest (44 bytes).
+    """
+    return base64.b64encode(hmac.new(salt, pw_bytes, hashlib.sha256).digest())
+
+
+async def _check_password(password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a stored hash, reusing recent successes.
+
+    Args:
+        password (str): The plaintext password to verify.
+        hashed_password (str): The stored hash, prefixed or legacy bcrypt.
+
+    Returns:
+        bool: True if the password matches the hash.
+    """
+    pw_bytes = password.encode("utf-8")
+    hash_bytes = hashed_password.encode("utf-8")
+    key = _verified_passwords.digest(pw_bytes, hash_bytes)
+    if _verified_passwords.get(key):
+        return True
+
+    if hashed_password.startswith(BCRYPT_SHA256_PREFIX):
+        bcrypt_hash = hash_bytes[len(BCRYPT_SHA256_PREFIX) :]
+        secret = _prehash(pw_bytes, bcrypt_hash[:_BCRYPT_SALT_LENGTH])
+    else:
+        # Legacy hashes were made from the password truncated to 72 bytes
+        secret = pw_bytes[:72]
+        bcrypt_hash = hash_bytes
+
+    # bcrypt is CPU-bound; run it off the event loop
+    verified = await asyncio.get_running_loop().run_in_executor(
+        _BCRYPT_POOL, bcrypt.checkpw, secret, bcrypt_hash
+    )
+    if verified:
+        _verified_passwords.set(
+            key, True, time.monotonic() + PASSWORD_CACHE_TTL_SECONDS
+        )
+    return verified
+
+
 async def read_user_by_id(
     session: AsyncSession, user_id: int
 ) -> Optional[Account]:
@@ -74,9 +202,8 @@ async def read_user_by_id(
     Returns:
         Optional[Account]: The found account instance or None.
     """
-    statement = select(Account).where(Account.id == user_id)
-    result = await session.execute(statement)
-    account = result.scalar_one_or_none()
+    # Served from the identity map when the account is already loaded
+    account = await session.get(Account, user_id)
 
     if account:
         logger.info(f"User '{user_id}' found in database.")
@@ -94,6 +221,8 @@ async def create_or_update_user(
 
     If the account exists, update its full name and title.
     If not, create a new account with the given details.
+    An existing account's roles are loaded in the same query and used to
+    prime the roles cache, so the login's role lookup needs no extra query.
 
     Args:
         session (AsyncSession): The SQLAlchemy async session.
@@ -104,11 +233,30 @@ async def create_or_update_user(
     Returns:
         Account: The created or updated account instance.
     """
-    statement = select(Account).where(Account.username == username)
+    statement = (
+        select(Account)
+        .options(
+            joinedload(Account.role_permissions).joinedload(
+                RolePermission.role
+            )
+        )
+        .where(Account.username == username)
+        .limit(1)
+    )
     result = await session.execute(statement)
-    account = result.scalar_one_or_none()
+    account = result.unique().scalar_one_or_none()
 
     if account:
+        await read_roles_cached(
+            session,
+            account.id,
+            roles=[
+                permission.role.name for permission in account.role_permissions
+            ],
+        )
+        has_default_role = any(
+            permission.role_id == 2 for permission in account.role_permissions
+        )
         account.full_name = full_name
         account.title = title
         message = f"Updated user '{username}' in database."
@@ -120,15 +268,22 @@ async def create_or_update_user(
             is_domain_user=True,
         )
         session.add(account)
+        has_default_role = False
         message = f"Created new user '{username}' in database."
 
+    # Flush to get account.id; the account and its role commit together
+    await session.flush()
+
+    # Assign the default role (Role ID: 2) unless the loaded roles have it
+    if has_default_role:
+        role_message = f"Role already assigned to user '{username}'."
+    else:
+        role_message = await ensure_user_has_role(
+            session, account.id, 2, username
+        )
     await session.commit()
-    await session.refresh(account)
 
     logger.info(message)
-
-    # Assign default role (Role ID: 1) if it's a new user
-    role_message = await ensure_user_has_role(session, account.id, 2, username)
     logger.info(role_message)
 
     return account
@@ -140,6 +295,8 @@ async def ensure_user_has_role(
     """
     Ensure the user has a specific role assigned.
 
+    The row is inserted in the session's transaction; the caller commits it.
+
     Args:
         session (AsyncSession): The SQLAlchemy async session.
         account_id (int): The account ID of the user.
@@ -149,22 +306,20 @@ async def ensure_user_has_role(
     Returns:
         str: Message indicating role assignment result.
     """
-    statement = select(RolePermission).where(
-        RolePermission.account_id == account_id,
-        RolePermission.role_id == role_id,
+    # One round trip: the unique (account_id, role_id) key turns a duplicate
+    # into a no-op update, so concurrent first logins cannot insert the row
+    # twice, while other integrity errors (e.g. an unknown role) still raise
+    statement = mysql_insert(RolePermission).values(
+        account_id=account_id, role_id=role_id
+    )
+    await session.execute(
+        statement.on_duplicate_key_update(role_id=statement.inserted.role_id)
     )
-    result = await session.execute(statement)
-    existing_role = result.scalar_one_or_none()
-
-    if existing_role:
-        logger.info(
-            f"Role ID {role_id} already assigned to user '{username}'."
-        )
-        return f"Role already assigned to user '{username}'."
 
-    role_permission = RolePermission(role_id=role_id, account_id=account_id)
-    session.add(role_permission)
-    await session.commit()
+    # SQLAlchemy's MySQL dialects report matched rather than changed rows,
+    # so rowcount cannot tell a new row from an existing one; drop the
+    # cached roles either way
+    invalidate_roles_cache(account_id)
 
     logger.info(f"Assigned Role ID {role_id} to user '{username}'.")
     return f"Role successfully assigned to user '{username}'."
@@ -201,3 +356,42 @@ async def read_roles(
         logger.warning(f"User ID {account_id} has no assigned roles.")
 
     return roles
+
+
+async def read_roles_cached(
+    session: AsyncSession,
+    account_id: Optional[int] = None,
+    roles: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Fetch role names like `read_roles`, reusing results for a short TTL.
+
+    Args:
+        session (AsyncSession): The SQLAlchemy async session.
+        account_id (int): The account ID to fetch roles for, or None for all roles.
+        roles (Optional[List[str]]): Role names already loaded for the
+            account; they replace the cached entry instead of a query.
+
+    Returns:
+        List[str]: A list of role names associated with the given account.
+    """
+    if roles is None:
+        roles = _roles_cache.get(account_id)
+        if roles is not None:
+            return roles
+        roles = await read_roles(session, account_id)
+
+    _roles_cache.set(
+        account_id, roles, time.monotonic() + ROLES_CACHE_TTL_SECONDS
+    )
+    return roles
+
+
+def invalidate_roles_cache(account_id: Optional[int] = None) -> None:
+    """
+    Drop the cached roles for an account after its role assignments change.
+
+    Args:
+        account_id (int): The account ID whose cached roles are stale.
+    """
+    _roles_cache.pop(account_id)
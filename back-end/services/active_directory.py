@@ -1,11 +1,32 @@
 import asyncio
+import itertools
 import os
 import logging
-from typing import List, Optional, Union
+import time
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import bonsai
-from bonsai.errors import AuthenticationError, LDAPError
-from dotenv import load_dotenv
+from bonsai.asyncio import AIOConnectionPool
+from bonsai.errors import (
+    AuthenticationError,
+    ClosedConnection,
+    ConnectionError as LDAPConnectionError,
+    LDAPError,
+    TimeoutError as LDAPTimeoutError,
+)
+from src.cache import ExpiringCache
 from src.schemas import DomainUser  # Ensure this path is correct
 
 # Logger configuration
@@ -15,13 +36,12 @@ logger = logging.getLogger(__name__)
 if os.name == "nt":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-# Load environment variables
-load_dotenv()
-
 # LDAP Environment variables
 LDAP_URL: str = os.getenv("LDAP_URL", "")
 LDAP_USER: str = os.getenv("LDAP_USER", "")
 LDAP_PASSWORD: str = os.getenv("LDAP_PASSWORD", "")
+LDAP_POOL_MIN_SIZE: int = int(os.getenv("LDAP_POOL_MIN_SIZE", "2"))
+LDAP_POOL_MAX_SIZE: int = int(os.getenv("LDAP_POOL_MAX_SIZE", "16"))
 
 # Organization Units (OUs) to search
 SEARCH_BASES: List[str] = [
@@ -30,6 +50,167 @@ SEARCH_BASES: List[str] = [
     "OU=Users,OU=ANC,OU=Andalusia,DC=andalusia,DC=loc",
 ]
 
+# Attributes read for every DomainUser, shared by all searches
+_ATTRS: List[str] = ["sAMAccountName", "displayName", "title"]
+
+# Directory data changes on human timescales, so searches are reused briefly
+DOMAIN_USERS_CACHE_TTL_SECONDS = 180.0
+USER_SEARCH_CACHE_TTL_SECONDS = 60.0
+SEARCH_CACHE_MAX_ENTRIES = 1024
+
+# Errors that leave a connection unusable; result errors such as
+# NoSuchObjectError or SizeLimitError do not, so they keep the connection
+_TRANSPORT_ERRORS = (LDAPConnectionError, ClosedConnection, LDAPTimeoutError)
+
+# Service-account connections, bound once and reused across searches
+_pool: Optional[AIOConnectionPool] = None
+
+# search key -> result; least recently used entries are evicted first
+_search_cache = ExpiringCache(SEARCH_CACHE_MAX_ENTRIES)
+# One task per key in flight, so concurrent misses share a single LDAP call
+_search_tasks: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+
+def get_ldap_pool() -> AIOConnectionPool:
+    """
+    Return the shared pool of service-account LDAP connections.
+
+    The pool is created on first use, so importing this module does not
+    require LDAP settings; connections are opened lazily by `spawn()`.
+
+    Returns:
+        AIOConnectionPool: The pool bound with LDAP_USER credentials.
+
+    Raises:
+        ValueError: If LDAP_URL is not set.
+    """
+    global _pool
+    if _pool is None:
+        if not LDAP_URL:
+            raise ValueError("LDAP_URL environment variable is not set.")
+        client = bonsai.LDAPClient(LDAP_URL)
+        client.set_credentials(
+            "SIMPLE", user=LDAP_USER, password=LDAP_PASSWORD
+        )
+        _pool = AIOConnectionPool(
+            client, minconn=LDAP_POOL_MIN_SIZE, maxconn=LDAP_POOL_MAX_SIZE
+        )
+    return _pool
+
+
+@asynccontextmanager
+async def _ldap_connection() -> AsyncIterator[bonsai.LDAPConnection]:
+    """
+    Yield a pooled service connection, closing it if its transport breaks.
+
+    The pool takes back any connection that is still open, so one that
+    raised a connection, closed-connection or timeout error is closed
+    first; the pool then drops it and later `spawn()` calls open a fresh
+    connection instead.
+
+    Yields:
+        bonsai.LDAPConnection: The connection to search on.
+    """
+    async with get_ldap_pool().spawn() as conn:
+        try:
+            yield conn
+        except _TRANSPORT_ERRORS:
+            conn.close()
+            raise
+
+
+def _first(entry, attribute: str) -> str:
+    """
+    Return the first value of an LDAP attribute, or "N/A" if it is missing.
+
+    Args:
+        entry: The bonsai LDAPEntry (or mapping) returned by a search.
+        attribute (str): The attribute name to read.
+
+    Returns:
+        str: The first attribute value, or "N/A".
+    """
+    values = entry.get(attribute)
+    return values[0] if values else "N/A"
+
+
+def _to_domain_user(entry) -> DomainUser:
+    """
+    Build a DomainUser from an LDAP entry without pydantic validation.
+
+    Directory values are already strings, so `model_construct` is safe here.
+
+    Args:
+        entry: The bonsai LDAPEntry returned by a search.
+
+    Returns:
+        DomainUser: The user with a temporary ID of 0.
+    """
+    return DomainUser.model_construct(
+        id=0,  # Temporary ID, will be set later
+        username=_first(entry, "sAMAccountName"),
+        fullName=_first(entry, "displayName"),
+        title=_first(entry, "title"),
+    )
+
+
+def _build_domain_users(results) -> List[DomainUser]:
+    """
+    Convert a full OU search result into DomainUser objects.
+
+    Args:
+        results: The list of bonsai LDAPEntry objects returned by a search.
+
+    Returns:
+        List[DomainUser]: The users with temporary IDs of 0.
+    """
+    return [_to_domain_user(entry) for entry in results]
+
+
+async def _cached_search(
+    key: Hashable,
+    ttl: float,
+    fetch: Callable[[], Awaitable[Any]],
+    cacheable: Callable[[Any], bool] = lambda result: result is not None,
+) -> Any:
+    """
+    Return a cached LDAP result, or fetch and cache it once per key.
+
+    Concurrent misses await the same in-flight fetch and all get its
+    result, failures included. Failed searches (None) are not cached, so
+    the next call after the fetch completes retries them.
+
+    Args:
+        key (Hashable): The cache key identifying the search.
+        ttl (float): Seconds the result stays valid.
+        fetch (Callable[[], Awaitable[Any]]): Performs the actual search.
+        cacheable (Callable[[Any], bool]): Decides whether a fetched result
+            may be stored; by default anything but None is.
+
+    Returns:
+        Any: The cached or freshly fetched result.
+    """
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    task = _search_tasks.get(key)
+    if task is None:
+
+        async def fetch_and_cache() -> Any:
+            result = await fetch()
+            if cacheable(result):
+                _search_cache.set(key, result, time.monotonic() + ttl)
+            return result
+
+        task = asyncio.create_task(fetch_and_cache())
+        _search_tasks[key] = task
+        task.add_done_callback(lambda _: _search_tasks.pop(key, None))
+
+    # Shielded so one caller being cancelled does not cancel the search
+    # the other callers are waiting on
+    return await asyncio.shield(task)
+
 
 async def search_ldap(
     ou: str, username: Optional[str] = None
@@ -37,6 +218,10 @@ async def search_ldap(
     """
     Search LDAP for a user or list of users in a specific Organizational Unit (OU).
 
+    Single-user results are cached briefly per (OU, username); failed
+    searches are not. Full OU scans are not cached here, since
+    `read_domain_users` caches the combined list.
+
     Args:
         ou (str): The Organizational Unit (OU) to search within.
         username (Optional[str]): The username (sAMAccountName) to search for (optional).
@@ -47,33 +232,35 @@ async def search_ldap(
         - A list of `DomainUser` objects if searching for all users in an OU.
         - `None` if no results found.
     """
-    client = bonsai.LDAPClient(LDAP_URL)
-    client.set_credentials("SIMPLE", user=LDAP_USER, password=LDAP_PASSWORD)
-
-    try:
-        async with client.connect(is_async=True) as conn:
-            logger.info(f"Connected to LDAP: {LDAP_URL}")
+    if not username:
+        return await _search_ldap(ou)
+    return await _cached_search(
+        ("user", ou, username),
+        USER_SEARCH_CACHE_TTL_SECONDS,
+        lambda: _search_ldap(ou, username),
+    )
 
-            attributes: List[str] = ["sAMAccountName", "displayName", "title"]
 
+async def _search_ldap(
+    ou: str, username: Optional[str] = None
+) -> Union[List[DomainUser], Optional[DomainUser]]:
+    """Run the uncached LDAP search behind `search_ldap`."""
+    try:
+        async with _ldap_connection() as conn:
             if username:
                 search_filter = f"(sAMAccountName={username})"
-                result = await conn.search(ou, 2, search_filter, attributes)
+                result = await conn.search(ou, 2, search_filter, _ATTRS)
 
                 if not result:
                     logger.warning(f"User '{username}' not found in {ou}.")
                     return None
 
-                return DomainUser(
-                    id=0,  # Temporary ID, will be set later
-                    username=result.get("sAMAccountName", ["N/A"])[0],
-                    fullName=result.get("displayName", ["N/A"])[0],
-                    title=result.get("title", ["N/A"])[0],
-                )
+                # search() returns a list of entries; take the first match
+                return _to_domain_user(result[0])
 
             # Search for all active users
             search_filter = "(&(objectCategory=person)(objectClass=user)(!(userAccountControl:1.2.840.113556.1.4.803:=2)))"
-            results = await conn.search(ou, 2, search_filter, attributes)
+            results = await conn.search(ou, 2, search_filter, _ATTRS)
 
             if not results:
                 logger.warning(f"No users found in {ou}.")
@@ -81,15 +268,9 @@ async def search_ldap(
 
             logger.info(f"Found {len(results)} users in {ou}")
 
-            return [
-                DomainUser(
-                    id=0,  # Temporary ID, will be set later
-                    username=entry.get("sAMAccountName", ["N/A"])[0],
-                    fullName=entry.get("displayName", ["N/A"])[0],
-                    title=entry.get("title", ["N/A"])[0],
-                )
-                for entry in results
-            ]
+            # Large OUs hold thousands of entries; convert them in a worker
+            # thread so the event loop keeps serving other requests
+            return await asyncio.to_thread(_build_domain_users, results)
 
     except LDAPError as e:
         logger.error(f"LDAP error during search in {ou}: {e}")
@@ -121,16 +302,19 @@ async def authenticate_and_get_user(
     client.set_credentials("SIMPLE", user=user_dn, password=password)
 
     try:
-        async with client.connect(is_async=True, timeout=5) as conn:
+        # Binding as the user verifies the password; nothing else is needed
+        # from this connection, so it is closed straight away
+        async with client.connect(is_async=True, timeout=5):
             logger.info(f"User {username} authenticated successfully.")
 
+        # Look up the user's attributes on a pooled service connection
+        async with _ldap_connection() as conn:
             # Search the entire Andalusia organizational unit
             base_dn = "OU=Andalusia,DC=andalusia,DC=loc"
             search_filter = f"(sAMAccountName={username})"
-            attributes = ["sAMAccountName", "displayName", "title"]
 
             # Perform a search in the entire OU=Andalusia
-            results = await conn.search(base_dn, 2, search_filter, attributes)
+            results = await conn.search(base_dn, 2, search_filter, _ATTRS)
 
             if not results:
                 logger.warning(
@@ -139,13 +323,7 @@ async def authenticate_and_get_user(
                 return None
 
             # Extract the first user found
-            entry = results[0]
-            return DomainUser(
-                id=0,  # Temporary ID
-                username=entry.get("sAMAccountName", ["N/A"])[0],
-                fullName=entry.get("displayName", ["N/A"])[0],
-                title=entry.get("title", ["N/A"])[0],
-            )
+            return _to_domain_user(results[0])
 
     except AuthenticationError:
         logger.warning(f"Authentication failed for user {username}.")
@@ -168,20 +346,54 @@ async def read_domain_users() -> List[DomainUser]:
     """
     Perform parallel searches on multiple Organizational Units (OUs) to fetch domain users.
 
+    The numbered list is cached as a whole and checked before a pooled
+    connection is taken, so repeat calls do no LDAP or numbering work.
+    Lists missing a failed OU are returned but not cached.
+
     Returns:
         List[DomainUser]: A list of all users from all specified OUs.
     """
+    users, _ = await _cached_search(
+        ("all_users",),
+        DOMAIN_USERS_CACHE_TTL_SECONDS,
+        _read_domain_users,
+        cacheable=lambda result: result[1],
+    )
+    return users
+
+
+async def _read_domain_users() -> Tuple[List[DomainUser], bool]:
+    """
+    Run the uncached OU searches behind `read_domain_users`.
+
+    Each OU is searched on its own pooled connection: bonsai's asyncio
+    connection polls a single socket and cannot run searches side by
+    side. The pool keeps the connections bound, so no bind is repeated.
+
+    Returns:
+        Tuple[List[DomainUser], bool]: The numbered users, and whether
+        every OU was searched successfully.
+    """
     tasks = [search_ldap(ou) for ou in SEARCH_BASES]
-    results = await asyncio.gather(*tasks)
+    # Wait for every OU even if one fails, so no search is left running
+    results = await asyncio.gather(*tasks, return_exceptions=True)
 
-    # Flatten and filter out any None results
+    for ou, result in zip(SEARCH_BASES, results):
+        if isinstance(result, BaseException):
+            logger.error(
+                f"Unexpected error during LDAP search in {ou}: {result}"
+            )
+
+    # Flatten, filter out any failed results and assign unique IDs in one
+    # pass; DomainUser is frozen, so number copies
+    ids = itertools.count(1)
     all_users: List[DomainUser] = [
-        user for sublist in results if sublist for user in sublist
+        user.model_copy(update={"id": next(ids)})
+        for sublist in results
+        if sublist and not isinstance(sublist, BaseException)
+        for user in sublist
     ]
 
-    # Assign unique IDs
-    for i, user in enumerate(all_users, start=1):
-        user.id = i
-
     logger.info(f"Total domain users retrieved: {len(all_users)}")
-    return all_users
+    complete = all(isinstance(result, list) for result in results)
+    return all_users, complete
@@ -17,4 +17,6 @@ class LoginResponse(BaseModel):
     email: str | None = None
     roles: List[str] | None = []
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(
+        from_attributes=True, extra="ignore", frozen=True
+    )
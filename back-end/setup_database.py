@@ -11,22 +11,24 @@ Steps:
 
 import asyncio
 import os
+import re
+
+from dotenv import load_dotenv
+
+#  Load environment variables before the project modules read them
+load_dotenv()
+
 from routers.srv.auth import hash_password
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select, SQLModel
-from dotenv import load_dotenv
 
 
 # Import models from your project
 from db.models import Role, Account
 
-
-#  Load environment variables
-load_dotenv()
-
 ADMIN_PASSWORD = os.getenv("DEFAULT_ADMIN_PASSWORD")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
@@ -36,6 +38,11 @@ if not DB_USER or not DB_PASSWORD or not DB_SERVER or not DB_NAME:
     raise ValueError(
         "Missing required environment variables for the database connection."
     )
+# Identifiers cannot be bound as SQL parameters, so only allow safe names
+if not re.fullmatch(r"[A-Za-z0-9_]+", DB_NAME):
+    raise ValueError(
+        "DB_NAME may only contain letters, digits and underscores."
+    )
 
 #  Database URLs
 ASYNC_DATABASE_URL = f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_SERVER}/{DB_NAME}?charset=utf8mb4"
@@ -57,19 +64,14 @@ def create_database_if_not_exists() -> None:
     try:
         engine = create_engine(BASE_SYNC_URL, echo=False, future=True)
         with engine.connect() as connection:
+            # One round trip: MySQL reports 1 row affected only when created
             result = connection.execute(
                 text(
-                    f"SELECT SCHEMA_NAME FROM INFORMATION_SCHEMA.SCHEMATA "
-                    f"WHERE SCHEMA_NAME = '{DB_NAME}'"
+                    f"CREATE DATABASE IF NOT EXISTS `{DB_NAME}` "
+                    "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
                 )
             )
-            if not result.scalar():
-                connection.execute(
-                    text(
-                        f"CREATE DATABASE {DB_NAME} "
-                        "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
-                    )
-                )
+            if result.rowcount:
                 print(f"Database '{DB_NAME}' created successfully.")
             else:
                 print(f"Database '{DB_NAME}' already exists.")
@@ -97,6 +99,56 @@ async def create_tables(async_engine: AsyncEngine) -> None:
         exit(1)
 
 
+# 2.1 Add Unique Keys Missing From Existing Tables (Asynchronous)
+async def add_role_permission_unique_key(async_engine: AsyncEngine) -> None:
+    """
+    Adds the (account_id, role_id) unique key to an existing role_permission table.
+    create_all only creates missing tables, so databases set up before the key
+    existed lack it. Duplicate assignments are deleted first, keeping the
+    oldest row of each pair.
+
+    Raises:
+        SystemExit: If there is an error altering the table.
+    """
+    try:
+        async with async_engine.begin() as conn:
+            result = await conn.execute(
+                text(
+                    "SELECT INDEX_NAME FROM information_schema.STATISTICS "
+                    "WHERE TABLE_SCHEMA = DATABASE() "
+                    "AND TABLE_NAME = 'role_permission' AND NON_UNIQUE = 0 "
+                    "GROUP BY INDEX_NAME HAVING GROUP_CONCAT("
+                    "COLUMN_NAME ORDER BY SEQ_IN_INDEX) = 'account_id,role_id'"
+                )
+            )
+            if result.first():
+                print("Role permission unique key already exists.")
+                return
+
+            print("Adding role permission unique key...")
+            result = await conn.execute(
+                text(
+                    "DELETE dup FROM role_permission AS dup "
+                    "JOIN role_permission AS kept "
+                    "ON kept.account_id = dup.account_id "
+                    "AND kept.role_id = dup.role_id "
+                    "AND kept.id < dup.id"
+                )
+            )
+            print(f"Removed {result.rowcount} duplicate role assignments.")
+            await conn.execute(
+                text(
+                    "ALTER TABLE role_permission "
+                    "ADD CONSTRAINT uq_role_permission_account_role "
+                    "UNIQUE (account_id, role_id)"
+                )
+            )
+        print("Role permission unique key added successfully.")
+    except OperationalError as e:
+        print(f"Error adding role permission unique key: {e}")
+        exit(1)
+
+
 # 3. Seed Default Values (Asynchronous)
 async def seed_default_values(engine: AsyncEngine) -> None:
     """
@@ -121,24 +173,26 @@ async def seed_default_values(engine: AsyncEngine) -> None:
 
 # 3.1 Helper: Seed Roles
 async def seed_roles(session: AsyncSession) -> None:
-    existing_roles = (await session.exec(select(Role))).all()
-    if not existing_roles:
+    existing_role = (await session.exec(select(Role).limit(1))).first()
+    if not existing_role:
         roles = [
             Role(name="Admin", description="Has full access to the system"),
             Role(name="User", description="Can access basic features"),
         ]
+        # Committed with the admin user by seed_default_values
         session.add_all(roles)
-        await session.commit()
         print("Default roles added.")
 
 
 # 3.4 Helper: Seed Admin User
 async def seed_admin_user(session: AsyncSession) -> None:
     admin_user = (
-        await session.exec(select(Account).where(Account.username == "admin"))
+        await session.exec(
+            select(Account).where(Account.username == "admin").limit(1)
+        )
     ).first()
     if not admin_user:
-        hashed_password = hash_password(ADMIN_PASSWORD)
+        hashed_password = await hash_password(ADMIN_PASSWORD)
         # Ideally, use a hashed password in production
         admin_user = Account(
             username="admin",
@@ -157,6 +211,7 @@ async def main_async() -> None:
     Orchestrates the entire database setup process:
     - Create database (if doesn't exist)
     - Create tables (if don't exist)
+    - Add unique keys missing from existing tables
     - Seed default values
     """
     create_database_if_not_exists()
@@ -167,6 +222,7 @@ async def main_async() -> None:
 
     try:
         await create_tables(async_engine)
+        await add_role_permission_unique_key(async_engine)
         await seed_default_values(async_engine)
 
     finally:
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple, Union
+
+
+class ExpiringCache:
+    """
+    A bounded in-memory LRU cache whose entries carry their own expiry.
+
+    Expiry times are compared against `clock`, so a cache can hold either
+    wall-clock deadlines such as a JWT's `exp` (`time.time`) or relative
+    TTLs (`time.monotonic`, the default). Once `max_entries` is exceeded
+    the least recently used entry is evicted.
+
+    Secrets such as tokens and passwords should not be used as keys
+    directly; `digest()` turns them into a BLAKE2b digest keyed with a
+    per-process random key, so cached digests cannot be precomputed or
+    matched against anything outside this process.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._digest_key = os.urandom(32)
+        # key -> (expiry on `clock`, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+
+    def digest(self, *parts: Union[str, bytes]) -> bytes:
+        """
+        Build a cache key from one or more secret values.
+
+        Each part is length-prefixed, so ("ab", "c") and ("a", "bc") never
+        share a key.
+
+        Args:
+            *parts (Union[str, bytes]): The values identifying the entry.
+
+        Returns:
+            bytes: A 16-byte keyed BLAKE2b digest.
+        """
+        hasher = hashlib.blake2b(digest_size=16, key=self._digest_key)
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode("utf-8")
+            hasher.update(len(part).to_bytes(8, "big"))
+            hasher.update(part)
+        return hasher.digest()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the value stored under `key` if it has not expired.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Optional[Any]: The cached value, or None if missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.clock() < entry[0]:
+            self._entries.move_to_end(key)
+            return entry[1]
+        del self._entries[key]
+        return None
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        """
+        Store `value` under `key` until `expires_at` on this cache's clock.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to store; None reads back as a miss.
+            expires_at (float): The expiry time, on the same clock.
+        """
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Remove `key` from the cache if present.
+
+        Args:
+            key (Hashable): The cache key.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,28 @@
+from typing import Iterable, Optional, Tuple
+
+
+def read_cookie(
+    headers: Iterable[Tuple[bytes, bytes]], name: str
+) -> Optional[str]:
+    """
+    Extract one cookie from raw ASGI headers without building a Request.
+
+    Args:
+        headers (Iterable[Tuple[bytes, bytes]]): The ASGI scope headers as
+            (name, value) byte pairs.
+        name (str): The cookie name.
+
+    Returns:
+        Optional[str]: The cookie value, or None if it is not present.
+    """
+    prefix = name.encode("latin-1") + b"="
+    value = None
+    for header, header_value in headers:
+        if header != b"cookie":
+            continue
+        for morsel in header_value.split(b";"):
+            morsel = morsel.strip()
+            if morsel.startswith(prefix):
+                # Last occurrence wins, matching Starlette's cookie parser
+                value = morsel[len(prefix) :].decode("latin-1")
+    return value
@@ -1,4 +1,3 @@
-from dotenv import load_dotenv
 import os
 from typing import Annotated
 from fastapi import Depends
@@ -6,16 +5,21 @@ from typing import Annotated
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Request, HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+import jwt
 from db.database import get_application_session
 from fastapi import Depends
 
 from services.http_schema import LoginResponse
+from src.tokens import TokenDecoder
 
 # Define your secret key and algorithm
 SECRET_KEY = os.getenv("SECRET_KEY")
+if not SECRET_KEY:
+    # Never fall back to a well-known key; tokens would be forgeable
+    raise ValueError("SECRET_KEY environment variable is not set.")
 
 ALGORITHM = "HS256"
+token_decoder = TokenDecoder(SECRET_KEY, ALGORITHM)
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -23,9 +27,9 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 async def decrypt(token: str):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_decoder.decode(token)
         return payload
-    except JWTError as e:
+    except jwt.InvalidTokenError as e:
         print(f"Token verification failed: {e}")
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
@@ -1,69 +1,89 @@
-from datetime import datetime, timedelta, timezone
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+import time
 from starlette.responses import JSONResponse
-from jose import jwt, JWTError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import jwt
 import os
 
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
+from src.cookies import read_cookie
+from src.tokens import TokenDecoder
 
 # Constants
-SECRET_KEY = os.getenv("SECRET_KEY", "default_secret")
+SECRET_KEY = os.getenv("SECRET_KEY")
+if not SECRET_KEY:
+    # Never fall back to a well-known key; tokens would be forgeable
+    raise ValueError("SECRET_KEY environment variable is not set.")
 ALGORITHM = "HS256"
 TOKEN_RENEW_THRESHOLD_MINUTES = 15
 ACCESS_TOKEN_EXPIRE_MINUTES = 20
+COOKIE_NAME = "access_token"
+
+# Attributes of the renewed cookie never change, so they are rendered once
+COOKIE_ATTRIBUTES = (
+    f"; HttpOnly; Max-Age={ACCESS_TOKEN_EXPIRE_MINUTES * 60}; Path=/"
+    "; SameSite=Lax; Secure"  # Adjust Secure based on environment
+)
+token_decoder = TokenDecoder(SECRET_KEY, ALGORITHM)
 
 
-class TokenRenewalMiddleware(BaseHTTPMiddleware):
+class TokenRenewalMiddleware:
     """
-    Middleware to renew JWT token if it's close to expiration.
+    Pure ASGI middleware to renew JWT token if it's close to expiration.
+
+    The renewed cookie is appended to the response headers when the
+    response starts, so no Request/Response objects are built per request.
     """
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Extract token from cookies
-        token = request.cookies.get("access_token")
+        token = read_cookie(scope["headers"], COOKIE_NAME)
         if not token:
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         try:
             # Decode the token
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            exp = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
-            now = datetime.now(timezone.utc)
-
-            # Check if the token is close to expiration
-            time_remaining = (exp - now).total_seconds() / 60
-            if time_remaining <= TOKEN_RENEW_THRESHOLD_MINUTES:
-                # Generate a new token with extended expiration
-                new_exp = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-                payload["exp"] = int(new_exp.timestamp())
-                new_token = jwt.encode(
-                    payload, SECRET_KEY, algorithm=ALGORITHM)
-
-                # Add the new token to the response cookies
-                response = await call_next(request)
-                response.set_cookie(
-                    key="access_token",
-                    value=new_token,
-                    httponly=True,
-                    secure=True,  # Adjust based on environment
-                    samesite="Lax",
-                    max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-                )
-                return response
-
+            payload = token_decoder.decode(token)
         except jwt.ExpiredSignatureError:
             # If the token is expired, return an unauthorized response
-            return JSONResponse(
+            response = JSONResponse(
                 {"detail": "Token expired. Please log in again."},
                 status_code=401,
             )
-        except JWTError:
+            await response(scope, receive, send)
+            return
+        except jwt.InvalidTokenError:
             # For other token errors, proceed without modifying the request
-            pass
+            await self.app(scope, receive, send)
+            return
+
+        # Check if the token is close to expiration
+        now = time.time()
+        time_remaining = payload["exp"] - now
+        if time_remaining > TOKEN_RENEW_THRESHOLD_MINUTES * 60:
+            await self.app(scope, receive, send)
+            return
+
+        # Generate a new token with extended expiration; the decoded claims
+        # are cached and shared, so build a new dict instead of mutating them
+        payload = {
+            **payload,
+            "exp": int(now + ACCESS_TOKEN_EXPIRE_MINUTES * 60),
+        }
+        new_token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+        cookie = f"{COOKIE_NAME}={new_token}{COOKIE_ATTRIBUTES}"
+        set_cookie = (b"set-cookie", cookie.encode("latin-1"))
+
+        async def send_with_cookie(message: Message):
+            # Add the new token to the response cookies
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), set_cookie]
+            await send(message)
 
-        return await call_next(request)
+        await self.app(scope, receive, send_with_cookie)
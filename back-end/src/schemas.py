@@ -8,4 +8,6 @@ class DomainUser(BaseModel):
     fullName: Optional[str] = None
     title: Optional[str] = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(
+        from_attributes=True, extra="ignore", frozen=True
+    )
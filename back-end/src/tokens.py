@@ -0,0 +1,58 @@
+import time
+from typing import Dict
+
+import jwt
+
+from src.cache import ExpiringCache
+
+
+class TokenDecoder:
+    """
+    Verify JWTs for one key and algorithm, caching recently verified claims.
+
+    A token that verified once is served from memory until its own `exp`,
+    so repeat requests skip the base64, JSON and HMAC work. The returned
+    claims are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        secret_key: str,
+        algorithm: str = "HS256",
+        max_entries: int = 16384,
+    ):
+        # Encoded once here instead of by PyJWT on every decode
+        self.secret_key = secret_key.encode()
+        self.algorithms = (algorithm,)
+        self._jwt = jwt.PyJWT()
+        # token digest -> claims, kept until the token's own exp
+        self._cache = ExpiringCache(max_entries, clock=time.time)
+
+    def decode(self, token: str) -> Dict:
+        """
+        Decode and verify a token, reusing the cached claims when possible.
+
+        Args:
+            token (str): The encoded JWT.
+
+        Returns:
+            Dict: The verified claims.
+
+        Raises:
+            jwt.ExpiredSignatureError: If the token has expired.
+            jwt.InvalidTokenError: If the token is otherwise invalid.
+        """
+        key = self._cache.digest(token)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Missing or expired: jwt.decode raises ExpiredSignatureError for
+        # the latter
+        payload = self._jwt.decode(
+            token, self.secret_key, algorithms=self.algorithms
+        )
+        exp = payload.get("exp")
+        if exp is not None:
+            self._cache.set(key, payload, exp)
+        return payload